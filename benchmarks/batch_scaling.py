@@ -0,0 +1,49 @@
+"""
+times BatchPricer.price against a plain Treasury.price loop for different worker counts
+
+python benchmarks/batch_scaling.py [n_bonds]
+"""
+__author__ = 'keithblackwell1'
+
+import sys
+import time
+import multiprocessing
+
+from bondfuns import Treasury, BatchPricer
+
+
+def make_bonds(n):
+    bonds = []
+    for i in xrange(n):
+        day = 15 if i % 2 else 31
+        month = [1, 3, 5, 7, 8, 10, 12][i % 7]
+        bonds.append(Treasury('%d/%d/%d' % (2016 + i % 30, month, day), .0025 * (i % 20),
+                              tenor=[2, 5, 10, 30][i % 4]))
+    return bonds
+
+
+def best_of(fun, reps=3):
+    times = []
+    for _ in xrange(reps):
+        t0 = time.time()
+        fun()
+        times.append(time.time() - t0)
+    return min(times)
+
+
+def main(n=20000):
+
+    bonds = make_bonds(n)
+    settle = '2015/7/8'
+
+    print '%d bonds, %d cpus' % (n, multiprocessing.cpu_count())
+    print 'loop      %.3f s' % best_of(lambda: [b.price(settle, .03) for b in bonds])
+
+    for workers in (1, 2, 4, 8):
+        bp = BatchPricer(workers=workers, chunk_size=max(n // (2 * workers), 1))
+        print 'workers %d %.3f s' % (workers, best_of(lambda: bp.price(bonds, settle, .03)))
+        bp.close()
+
+
+if __name__ == '__main__':
+    main(*[int(x) for x in sys.argv[1:]])
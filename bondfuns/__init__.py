@@ -1,4 +1,6 @@
 __author__ = 'keithblackwell1'
 
 from bonds import Treasury
-from calendar import Calendar, to_datetime, to_epoch_milli
\ No newline at end of file
+from calendar import Calendar, StripedLockCache, to_datetime, to_epoch_milli
+from batch import BatchPricer
+from index import TreasuryIndex
\ No newline at end of file
@@ -0,0 +1,282 @@
+__author__ = 'keithblackwell1'
+
+from multiprocessing.pool import ThreadPool
+import numpy as np
+
+from bondfuns.bonds import UST_CALENDAR, UST_CFS
+from bondfuns.calendar import to_datetime
+
+
+## UST_CFS slices as int64 ordinal arrays with the same min / max dates as ust_get_cash_flow
+_CF_TABLES = (
+    (True, tuple(np.array([d.toordinal() for d in x], dtype=np.int64) for x in UST_CFS.mid_by_skip),
+     UST_CFS.mid[0].toordinal(), UST_CFS.mid[-1].toordinal()),
+    (False, tuple(np.array([d.toordinal() for d in x], dtype=np.int64) for x in UST_CFS.end_by_skip),
+     UST_CFS.end[0].toordinal(), UST_CFS.end[-1].toordinal()),
+)
+
+
+class BatchPricer(object):
+    """
+    Thread pool batch calculator for lists of Treasury objects.
+
+    __init__(self, workers=4, chunk_size=2048):
+
+    maturity, issue date, coupon and settle date are read off the bonds once, then the bonds are
+    split into chunks of chunk_size and each chunk is handed to one of workers threads. inside a
+    chunk the cash flow schedule (np.searchsorted over the UST_CFS tables), the discounting, the
+    newton solve and the duration sums are all done on (bonds x cash flows) numpy arrays.
+    bonds outside the cash flow tables fall back to Treasury._price_yield_setup.
+    benchmarks/batch_scaling.py times it against a plain loop for different worker counts.
+
+    Instance Methods are:
+
+    param: bonds -> list of Treasury objects
+    param: settle_dates -> a single settle date for every bond or a list of one settle date per bond
+    param: tplus -> set to zero if entering settle date, set to 1 if entering trade date
+
+    price(self, bonds, settle_dates, ytms, tplus=0): list of clean prices
+    ytm(self, bonds, settle_dates, prices, tplus=0): list of yields to maturity
+    duration(self, bonds, settle_dates, prices_or_yields, tplus=0): list of modified durations
+    dv01(self, bonds, settle_dates, prices_or_yields, tplus=0): list of dv01s
+    acc_int(self, bonds, settle_dates, tplus=0): list of accrued interest
+    close(self): shuts down the thread pool
+
+    results match the single bond Treasury methods, including 0 for matured bonds and a
+    RuntimeError when the yield solve fails to converge
+
+    In[2]: from bondfuns import Treasury, BatchPricer
+
+    In[3]: bp = BatchPricer(workers=4)
+
+    In[4]: bp.price([Treasury('2020/5/31', .0125), Treasury('2018/5/31', .0075)], '2015/7/8', [.0125, .0075])
+    Out[4]: [99.9997, 99.9999]
+
+    """
+
+    def __init__(self, workers=4, chunk_size=2048):
+
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = ThreadPool(workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def price(self, bonds, settle_dates, ytms, tplus=0):
+        return self._run(_price_chunk, bonds, settle_dates, ytms, tplus)
+
+    def ytm(self, bonds, settle_dates, prices, tplus=0):
+        return self._run(_ytm_chunk, bonds, settle_dates, prices, tplus)
+
+    def duration(self, bonds, settle_dates, prices_or_yields, tplus=0):
+        return self._run(_duration_chunk, bonds, settle_dates, prices_or_yields, tplus)
+
+    def dv01(self, bonds, settle_dates, prices_or_yields, tplus=0):
+        return self._run(_dv01_chunk, bonds, settle_dates, prices_or_yields, tplus)
+
+    def acc_int(self, bonds, settle_dates, tplus=0):
+        return self._run(_acc_int_chunk, bonds, settle_dates, [None] * len(bonds), tplus)
+
+    def _run(self, chunk_fun, bonds, settle_dates, values, tplus):
+
+        n = len(bonds)
+
+        if isinstance(settle_dates, (list, tuple)):
+            if len(settle_dates) != n:
+                raise ValueError('settle_dates must be a single date or one date per bond')
+        else:
+            settle_dates = [settle_dates] * n
+
+        if isinstance(values, (list, tuple, np.ndarray)):
+            if len(values) != n:
+                raise ValueError('must enter one price or yield per bond')
+        else:
+            values = [values] * n
+
+        arrays = _bond_arrays(bonds, settle_dates, tplus)
+        values = np.array([0. if v is None else v for v in values], dtype=float)
+
+        size = self.chunk_size
+        chunks = [(bonds[i:i + size], settle_dates[i:i + size], [a[i:i + size] for a in arrays],
+                   values[i:i + size], tplus)
+                  for i in xrange(0, n, size)]
+
+        results = self._pool.map(chunk_fun, chunks)
+        return [x for chunk in results for x in chunk]
+
+
+def _bond_row(bond):
+    maturity_date = bond.maturity_date
+    issue_date = bond.issue_date
+
+    if maturity_date is None:
+        return 0, False, 0, 0, 0.
+
+    return (maturity_date.toordinal(), maturity_date.day == 15, (maturity_date.month - 1) % 6,
+            0 if issue_date is None else issue_date.toordinal(), bond.coupon)
+
+
+def _bond_arrays(bonds, settle_dates, tplus):
+    """
+    the only per bond python work: reads settle, maturity, issue date and coupon into numpy arrays.
+    settle dates are converted once per distinct date. a maturity of 0 marks a bond with no maturity
+    """
+    ordinals = {}
+    for s in set(settle_dates):
+        day = to_datetime(s) if tplus == 0 else UST_CALENDAR.next_b_day(s, tplus)
+        ordinals[s] = day.toordinal()
+
+    settle = np.array([ordinals[s] for s in settle_dates], dtype=np.int64)
+    maturity, mid, skip, issue, coupon = zip(*[_bond_row(b) for b in bonds]) if bonds else [()] * 5
+
+    return (settle, np.array(maturity, dtype=np.int64), np.array(mid, dtype=bool),
+            np.array(skip, dtype=np.int64), np.array(issue, dtype=np.int64), np.array(coupon, dtype=float))
+
+
+def _setup_arrays(bonds, settle_dates, arrays, tplus):
+    """
+    vectorized Treasury._price_yield_setup. returns accrued interest and zero padded
+    (bonds x cash flows) time and cash flow arrays. padded values are 0 so they drop out of every sum.
+    the principal is added to the last coupon, which is paid at the same time.
+    alive is False for bonds that have matured or have no maturity.
+    """
+    settle, maturity, mid, skip, issue, coupon = arrays
+    n = len(settle)
+
+    alive = (maturity > 0) & (settle < maturity)
+    settle = np.maximum(settle, issue)
+
+    cf0 = np.zeros(n, dtype=np.int64)
+    cf1 = np.ones(n, dtype=np.int64)
+    count = np.zeros(n, dtype=np.int64)
+    fallback = np.zeros(n, dtype=bool)
+
+    for is_mid, tables, min_date, max_date in _CF_TABLES:
+        for s, table in enumerate(tables):
+            idx = np.flatnonzero(alive & (mid == is_mid) & (skip == s))
+            if len(idx) == 0:
+                continue
+
+            p_set = np.searchsorted(table, settle[idx], 'right')
+            p_mat = np.searchsorted(table, maturity[idx], 'left')
+            ok = (settle[idx] >= min_date) & (maturity[idx] <= max_date) & (p_set > 0) & (p_mat < len(table))
+
+            p_set = np.clip(p_set, 1, len(table) - 1)
+            cf0[idx] = table[p_set - 1]
+            cf1[idx] = table[p_set]
+            count[idx] = p_mat - p_set + 1
+            fallback[idx[~ok]] = True
+
+    ## a bond issued on its maturity date has no cash flows left
+    alive &= (count > 0) | fallback
+
+    accrual = (settle - cf0) / (cf1 - cf0).astype(float)
+    accrual[~alive] = 0.
+
+    for i in np.flatnonzero(fallback):
+        _, cf_times, _, _ = bonds[i]._price_yield_setup(settle_dates[i], tplus)
+        count[i] = len(cf_times) - 1
+        accrual[i] = 1 - cf_times[0]
+
+    acc = np.where(alive, coupon * 100 * accrual / 2, 0.)
+
+    width = max(count.max() if n else 0, 1)
+    times = (1 - accrual)[:, None] + np.arange(width)
+    cfs = np.where(np.arange(width) < count[:, None], (coupon * 50)[:, None], 0.)
+
+    rows = np.flatnonzero(alive)
+    cfs[rows, count[rows] - 1] += 100
+
+    return acc, times, cfs, alive
+
+
+def _dirty_price(times, cfs, ytm):
+    return (cfs * (1 + ytm[:, None] / 2) ** -times).sum(axis=1)
+
+
+def _price_slope(times, cfs, ytm):
+    return (-.5 * cfs * times * (1 + ytm[:, None] / 2) ** (-1 - times)).sum(axis=1)
+
+
+def _solve_ytm(times, cfs, dirty, tol=1.48e-8, maxiter=50):
+    """
+    vectorized newton solve of each row, same start, tolerance and RuntimeError as optimize.newton
+    """
+    ytm = np.full(len(dirty), .05)
+
+    for _ in xrange(maxiter):
+        step = (_dirty_price(times, cfs, ytm) - dirty) / _price_slope(times, cfs, ytm)
+        ytm = ytm - step
+        if np.all(np.abs(step) < tol):
+            return ytm
+
+    raise RuntimeError('Failed to converge after %d iterations for %d bonds'
+                       % (maxiter, np.sum(~(np.abs(step) < tol))))
+
+
+def _price_and_yield(times, cfs, acc, price_or_yield):
+    """
+    same rule as Treasury.duration: values > 1 are prices, otherwise yields
+    """
+    is_price = price_or_yield > 1
+    ytm = np.where(is_price, 0., price_or_yield)
+
+    if is_price.any():
+        ytm[is_price] = _solve_ytm(times[is_price], cfs[is_price], price_or_yield[is_price] + acc[is_price])
+
+    price = np.where(is_price, price_or_yield, _dirty_price(times, cfs, ytm) - acc)
+    return price, ytm
+
+
+def _finish(alive, values):
+    return np.where(alive, values, 0).tolist()
+
+
+def _price_chunk(args):
+    bonds, settle_dates, arrays, ytms, tplus = args
+    acc, times, cfs, alive = _setup_arrays(bonds, settle_dates, arrays, tplus)
+    ytm = np.asarray(ytms, dtype=float)
+    return _finish(alive, np.round(_dirty_price(times, cfs, ytm) - acc, 4))
+
+
+def _ytm_chunk(args):
+    bonds, settle_dates, arrays, prices, tplus = args
+    acc, times, cfs, alive = _setup_arrays(bonds, settle_dates, arrays, tplus)
+    price = np.asarray(prices, dtype=float)
+    ytm = np.zeros(len(bonds))
+    ytm[alive] = _solve_ytm(times[alive], cfs[alive], price[alive] + acc[alive])
+    return _finish(alive, np.round(ytm, 6))
+
+
+def _duration_chunk(args):
+    bonds, settle_dates, arrays, prices_or_yields, tplus = args
+    acc, times, cfs, alive = _setup_arrays(bonds, settle_dates, arrays, tplus)
+    times, cfs, acc = times[alive], cfs[alive], acc[alive]
+    price, ytm = _price_and_yield(times, cfs, acc, np.asarray(prices_or_yields, dtype=float)[alive])
+    duration = np.zeros(len(bonds))
+    duration[alive] = _price_slope(times, cfs, ytm) / -price
+    return duration.tolist()
+
+
+def _dv01_chunk(args):
+    bonds, settle_dates, arrays, prices_or_yields, tplus = args
+    acc, times, cfs, alive = _setup_arrays(bonds, settle_dates, arrays, tplus)
+    times, cfs, acc = times[alive], cfs[alive], acc[alive]
+    _, ytm = _price_and_yield(times, cfs, acc, np.asarray(prices_or_yields, dtype=float)[alive])
+    dv01 = np.zeros(len(bonds))
+    dv01[alive] = _price_slope(times, cfs, ytm) / 100
+    return dv01.tolist()
+
+
+def _acc_int_chunk(args):
+    bonds, settle_dates, arrays, _, tplus = args
+    acc, _, _, alive = _setup_arrays(bonds, settle_dates, arrays, tplus)
+    return _finish(alive, acc)
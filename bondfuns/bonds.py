@@ -394,6 +394,9 @@ class Treasury(Bond):
 class UstCashFlows(object):
     """
     this is just an object to hide the cash flow tuples for fast UST cf creation
+
+    everything is built once at import as tuples, including the six maturity month
+    slices (mid_by_skip, end_by_skip), so UST_CFS is immutable and safe to share between threads
     """
     def __init__(self):
 
@@ -401,8 +404,11 @@ class UstCashFlows(object):
         mid_month_path = os.path.join(this_dir, 'data', 'ust_mid_month_cash_flows.csv')
         end_month_path = os.path.join(this_dir, 'data', 'ust_end_month_cash_flows.csv')
 
-        self.mid = open_string_csv_to_datetime(mid_month_path)
-        self.end = open_string_csv_to_datetime(end_month_path)
+        self.mid = tuple(open_string_csv_to_datetime(mid_month_path))
+        self.end = tuple(open_string_csv_to_datetime(end_month_path))
+
+        self.mid_by_skip = tuple(self.mid[skip::6] for skip in xrange(6))
+        self.end_by_skip = tuple(self.end[skip::6] for skip in xrange(6))
 
 ## initializes the cash flow object
 UST_CFS = UstCashFlows()
@@ -413,12 +419,12 @@ def _ust_cash_flow(settle_date, maturity_date):
     :type issue_date: object
     """
     if maturity_date.day == 15:
-        search_list = UST_CFS.mid
+        search_lists = UST_CFS.mid_by_skip
         min_date = datetime.datetime(1980, 1, 15, 0, 0)
         max_date = datetime.datetime(2063, 3, 15, 0, 0)
 
     else:
-        search_list = UST_CFS.end
+        search_lists = UST_CFS.end_by_skip
         min_date = datetime.datetime(1980, 1, 31, 0, 0)
         max_date = datetime.datetime(2063, 3, 31, 0, 0)
 
@@ -430,7 +436,7 @@ def _ust_cash_flow(settle_date, maturity_date):
 
     m_month = maturity_date.month
     skip = skip_rule[m_month]
-    search_list = search_list[skip:: 6]
+    search_list = search_lists[skip]
 
     p_mat = bs.bisect_left(search_list, maturity_date)
     p_set = bs.bisect_right(search_list, settle_date)
@@ -444,12 +450,12 @@ def ust_get_cash_flow(settle_date, maturity_date, issue_date=None, tenor=None, a
     :type issue_date: object
     """
     if maturity_date.day == 15:
-        search_list = UST_CFS.mid
+        search_lists = UST_CFS.mid_by_skip
         min_date = datetime.datetime(1980, 1, 15, 0, 0)
         max_date = datetime.datetime(2063, 3, 15, 0, 0)
 
     else:
-        search_list = UST_CFS.end
+        search_lists = UST_CFS.end_by_skip
         min_date = datetime.datetime(1980, 1, 31, 0, 0)
         max_date = datetime.datetime(2063, 3, 31, 0, 0)
 
@@ -477,7 +483,7 @@ def ust_get_cash_flow(settle_date, maturity_date, issue_date=None, tenor=None, a
 
     m_month = maturity_date.month
     skip = skip_rule[m_month]
-    search_list = search_list[skip:: 6]
+    search_list = search_lists[skip]
 
     p_mat = bs.bisect_left(search_list, maturity_date)
     p_set = bs.bisect_right(search_list, settle_date)
@@ -5,6 +5,7 @@ import datetime
 import bisect as bs
 import csv
 import os
+import threading
 
 
 class Calendar(object):
@@ -24,6 +25,9 @@ class Calendar(object):
     is_b_day(self, today):
     next_b_day(self, today, step=1):
 
+    holidays are stored as an immutable tuple and next_b_day results are memoized in a
+    StripedLockCache, so a single Calendar can be shared between threads.
+
     In[2]: from bondfuns import Calendar
 
     In[3]: cal = Calendar()
@@ -47,7 +51,8 @@ class Calendar(object):
         this_dir, this_filename = os.path.split(__file__)
         holiday_path = os.path.join(this_dir, 'data', holiday_file)
 
-        self.holidays = open_string_csv_to_datetime(holiday_path)
+        self.holidays = tuple(open_string_csv_to_datetime(holiday_path))
+        self._b_day_cache = StripedLockCache()
 
     def is_holiday(self, today):
 
@@ -88,6 +93,10 @@ class Calendar(object):
 
         today = to_datetime(today)
 
+        return self._b_day_cache.get_or_compute((today, step), self._next_b_day, today, step)
+
+    def _next_b_day(self, today, step):
+
         if step >= 0:
             step_ahead_rule = {0: 1, 1: 1, 2: 1, 3: 1, 4: 3, 5: 2, 6: 1}
 
@@ -112,6 +121,50 @@ class Calendar(object):
         return today
 
 
+class StripedLockCache(object):
+    """
+    Thread safe memoization dict for sharing between threads.
+
+    __init__(self, stripes=16):
+
+    keys are hashed onto one of stripes dicts, each guarded by its own lock, so threads
+    looking up different keys rarely wait on each other. values are computed outside the
+    lock, so two threads may both compute a missing key but only the first result is kept.
+
+    get_or_compute(self, key, fun, *args): returns cached value for key or stores fun(*args)
+    clear(self): empties every stripe
+    """
+
+    def __init__(self, stripes=16):
+
+        self._stripes = tuple({} for _ in xrange(stripes))
+        self._locks = tuple(threading.Lock() for _ in xrange(stripes))
+
+    def __len__(self):
+        return sum(len(stripe) for stripe in self._stripes)
+
+    def get_or_compute(self, key, fun, *args):
+
+        i = hash(key) % len(self._stripes)
+        stripe = self._stripes[i]
+        lock = self._locks[i]
+
+        with lock:
+            if key in stripe:
+                return stripe[key]
+
+        value = fun(*args)
+
+        with lock:
+            return stripe.setdefault(key, value)
+
+    def clear(self):
+
+        for stripe, lock in zip(self._stripes, self._locks):
+            with lock:
+                stripe.clear()
+
+
 def to_epoch_milli(today):
 
     t0 = datetime.datetime(1969, 12, 31, 19, 0)
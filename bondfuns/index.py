@@ -0,0 +1,291 @@
+__author__ = 'keithblackwell1'
+
+import bisect as bs
+import itertools
+import threading
+from dateutil.relativedelta import relativedelta
+from bondfuns.calendar import to_datetime
+from bondfuns.bonds import UST_CALENDAR
+
+
+class TreasuryIndex(object):
+    """
+    Sorted screening index over a universe of Treasury objects.
+
+    __init__(self, bonds=(), pricer=None):
+
+    keeps the bonds sorted by maturity ordinal and by coupon, so range and nearest queries are
+    answered by bisect instead of scanning every bond. duration keys are built the first time a
+    settle date is queried and kept until a different settle date is asked for. add, remove and
+    set_mark update every sorted list in place, including the cached duration day. every method
+    holds one lock, so an index can be shared between threads.
+
+    durations use the mark entered with add or set_mark (a price or a yield, same rule as
+    Treasury.duration). bonds without a mark are valued at a yield equal to their coupon.
+    if pricer is a BatchPricer the duration day is computed with it.
+
+    Instance Methods are:
+
+    param: settle_date -> date the trade settles on
+    param: tplus -> set to zero if entering settle date, set to 1 if entering trade date
+
+    add(self, bond, price_or_yield=None):
+    remove(self, bond):
+    set_mark(self, bond, price_or_yield):
+    maturing_between(self, start, end): bonds with start <= maturity_date <= end
+    nearest_maturity(self, today): bond maturing closest to today
+    nearest_tenor(self, settle_date, years, tplus=0): bond maturing closest to settle_date + years (rounded to months)
+    coupon_between(self, low, high): bonds with low <= coupon <= high
+    duration_between(self, settle_date, low, high, tplus=0): outstanding bonds with low <= duration <= high
+    nearest_duration(self, settle_date, duration, tplus=0): outstanding bond with duration closest to duration
+
+    all range queries return lists sorted by the key being screened on
+
+    In[2]: from bondfuns import Treasury, TreasuryIndex
+
+    In[3]: idx = TreasuryIndex([Treasury('2020/5/31', .0125), Treasury('2018/5/31', .0075)])
+
+    In[4]: idx.maturing_between('2018/1/1', '2019/1/1')
+    Out[4]: [T_0.75_2018_05_31]
+
+    In[5]: idx.nearest_tenor('2015/7/8', 5)
+    Out[5]: T_1.25_2020_05_31
+
+    """
+
+    def __init__(self, bonds=(), pricer=None):
+
+        self.pricer = pricer
+
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._ids = {}
+        self._marks = {}
+        self._mat_of = {}
+        self._coup_of = {}
+
+        self._mat_keys = []
+        self._mat_bonds = []
+        self._coup_keys = []
+        self._coup_bonds = []
+
+        self._dur_settle = None
+        self._dur_keys = []
+        self._dur_bonds = []
+        self._dur_of = {}
+
+        for bond in bonds:
+            self.add(bond)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._mat_bonds)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._mat_bonds))
+
+    def __contains__(self, bond):
+        with self._lock:
+            return bond in self._ids
+
+    def add(self, bond, price_or_yield=None):
+
+        with self._lock:
+            self._add(bond, price_or_yield)
+
+    def _add(self, bond, price_or_yield):
+
+        if bond in self._ids:
+            raise ValueError('%s is already in the index' % bond)
+
+        if bond.maturity_date is None or bond.coupon is None:
+            raise ValueError('bonds need a maturity_date and coupon to be indexed')
+
+        i = next(self._seq)
+        mat_key = (bond.maturity_date.toordinal(), i)
+        coup_key = (bond.coupon, i)
+
+        if self._dur_settle is not None:
+            self._insert_duration(bond, i, price_or_yield)
+
+        self._ids[bond] = i
+        self._marks[bond] = price_or_yield
+        self._mat_of[bond] = mat_key
+        self._coup_of[bond] = coup_key
+
+        _insert(self._mat_keys, self._mat_bonds, mat_key, bond)
+        _insert(self._coup_keys, self._coup_bonds, coup_key, bond)
+
+    def remove(self, bond):
+        """
+        remove(self, bond):
+        uses the keys stored by add, so a bond whose maturity_date or coupon changed since is still found
+        """
+        with self._lock:
+            self._ids.pop(bond)
+            del self._marks[bond]
+
+            _delete(self._mat_keys, self._mat_bonds, self._mat_of.pop(bond))
+            _delete(self._coup_keys, self._coup_bonds, self._coup_of.pop(bond))
+            self._delete_duration(bond)
+
+    def set_mark(self, bond, price_or_yield):
+
+        with self._lock:
+            if bond not in self._ids:
+                raise KeyError(bond)
+
+            if self._dur_settle is not None:
+                self._insert_duration(bond, self._ids[bond], price_or_yield, replace=True)
+
+            self._marks[bond] = price_or_yield
+
+    def maturing_between(self, start, end):
+
+        start = to_datetime(start).toordinal()
+        end = to_datetime(end).toordinal()
+
+        with self._lock:
+            return _between(self._mat_keys, self._mat_bonds, start, end)
+
+    def nearest_maturity(self, today):
+
+        today = to_datetime(today).toordinal()
+
+        with self._lock:
+            return _nearest(self._mat_keys, self._mat_bonds, today)
+
+    def nearest_tenor(self, settle_date, years, tplus=0):
+        """
+        nearest_tenor(self, settle_date, years, tplus=0):
+        bond maturing closest to the years point from settle_date, e.g. nearest_tenor(today, 7)
+        fractional points like 2.5 are rounded to the nearest month
+        only bonds maturing after settle_date are considered
+        """
+        settle_date = self._settle(settle_date, tplus)
+        target = settle_date + relativedelta(months=int(round(years * 12)))
+
+        with self._lock:
+            lo = bs.bisect_right(self._mat_keys, (settle_date.toordinal(), float('inf')))
+            return _nearest(self._mat_keys, self._mat_bonds, target.toordinal(), lo)
+
+    def coupon_between(self, low, high):
+
+        with self._lock:
+            return _between(self._coup_keys, self._coup_bonds, low, high)
+
+    def duration_between(self, settle_date, low, high, tplus=0):
+
+        settle_date = self._settle(settle_date, tplus)
+
+        with self._lock:
+            self._load_durations(settle_date)
+            return _between(self._dur_keys, self._dur_bonds, low, high)
+
+    def nearest_duration(self, settle_date, duration, tplus=0):
+
+        settle_date = self._settle(settle_date, tplus)
+
+        with self._lock:
+            self._load_durations(settle_date)
+            return _nearest(self._dur_keys, self._dur_bonds, duration)
+
+    def _settle(self, settle_date, tplus):
+
+        if tplus == 0:
+            return to_datetime(settle_date)
+
+        return UST_CALENDAR.next_b_day(settle_date, tplus)
+
+    @staticmethod
+    def _outstanding(bond, settle_date):
+
+        issue_date = bond.issue_date
+
+        if bond.maturity_date <= settle_date:
+            return False
+
+        return issue_date is None or issue_date <= settle_date
+
+    @staticmethod
+    def _mark(bond, mark):
+        return bond.coupon if mark is None else mark
+
+    def _load_durations(self, settle_date):
+        """
+        builds the sorted duration keys for settle_date unless they are already cached.
+        the cached day is only replaced once every duration has been computed
+        """
+        if settle_date == self._dur_settle:
+            return
+
+        bonds = [b for b in self._mat_bonds if self._outstanding(b, settle_date)]
+        marks = [self._mark(b, self._marks[b]) for b in bonds]
+
+        if self.pricer is not None:
+            durations = self.pricer.duration(bonds, settle_date, marks)
+        else:
+            durations = [b.duration(settle_date, m) for b, m in zip(bonds, marks)]
+
+        pairs = sorted(((d, self._ids[b]), b) for d, b in zip(durations, bonds))
+
+        self._dur_keys = [k for k, _ in pairs]
+        self._dur_bonds = [b for _, b in pairs]
+        self._dur_of = dict((b, k) for k, b in pairs)
+        self._dur_settle = settle_date
+
+    def _insert_duration(self, bond, i, mark, replace=False):
+        """
+        computes the duration before touching the cached day, so a failed solve leaves it unchanged
+        """
+        key = None
+        if self._outstanding(bond, self._dur_settle):
+            key = (bond.duration(self._dur_settle, self._mark(bond, mark)), i)
+
+        if replace:
+            self._delete_duration(bond)
+
+        if key is not None:
+            self._dur_of[bond] = key
+            _insert(self._dur_keys, self._dur_bonds, key, bond)
+
+    def _delete_duration(self, bond):
+
+        key = self._dur_of.pop(bond, None)
+        if key is not None:
+            _delete(self._dur_keys, self._dur_bonds, key)
+
+
+def _insert(keys, bonds, key, bond):
+    j = bs.bisect_right(keys, key)
+    keys.insert(j, key)
+    bonds.insert(j, bond)
+
+
+def _delete(keys, bonds, key):
+    j = bs.bisect_left(keys, key)
+    if j == len(keys) or keys[j] != key:
+        raise ValueError('key %s is not in the index' % (key,))
+    del keys[j]
+    del bonds[j]
+
+
+def _between(keys, bonds, low, high):
+    lo = bs.bisect_left(keys, (low,))
+    hi = bs.bisect_right(keys, (high, float('inf')))
+    return bonds[lo:hi]
+
+
+def _nearest(keys, bonds, target, lo=0):
+    """
+    bond whose key is closest to target, ties go to the smaller key
+    """
+    j = bs.bisect_left(keys, (target,), lo)
+    candidates = [k for k in (j - 1, j) if lo <= k < len(keys)]
+
+    if not candidates:
+        return None
+
+    best = min(candidates, key=lambda k: abs(keys[k][0] - target))
+    return bonds[best]
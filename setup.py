@@ -25,7 +25,7 @@ setup(
     license="MIT",
     packages=["bondfuns"],
     package_data={'bondfuns':['data/*.csv']},
-    install_requires=[ "dateutils"],
+    install_requires=[ "dateutils", "numpy"],
     classifiers=[
         'Development Status :: Alpha',
         'Intended Audience :: Developers',